@@ -8,70 +8,235 @@ Uses simpler signal handling to avoid recursive cleanup issues.
 
 import os
 import sys
+import functools
 import platform
-import urllib.request
-import stat
 import tarfile
 import shutil
 import zipfile
+import threading
+import time
+import requests
+import urllib3
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from version import get_latest_tag
 
 
-def get_platform_binary_name() -> str:
-    """Get the platform-specific binary name."""
+class _ResumableDownload:
+    """Read-only file object over an HTTP download.
+
+    If the connection drops mid-transfer the download is reissued with a
+    `Range: bytes=N-` header so only the remaining bytes are fetched again.
+    """
+
+    def __init__(self, url: str, max_retries: int = 5, timeout: int = 30):
+        self.url = url
+        # Installers download concurrently, so every message names its file
+        self.name = url.rsplit("/", 1)[-1]
+        self.max_retries = max_retries
+        self.timeout = timeout
+        self.position = 0
+        self.total = 0
+        self._last_reported = 0
+        self._retries = 0
+        self._response = None
+        self._open()
+
+    def _open(self) -> None:
+        # Range offsets and Content-Length count bytes on the wire, so ask for the
+        # body unencoded to keep them in the same unit as self.position
+        headers = {"Accept-Encoding": "identity"}
+        if self.position:
+            headers["Range"] = f"bytes={self.position}-"
+        response = requests.get(self.url, stream=True, timeout=self.timeout, headers=headers)
+        response.raise_for_status()
+        # Not IOErrors below: retrying will not change how the server responds
+        if response.headers.get("Content-Encoding", "identity") != "identity":
+            response.close()
+            raise RuntimeError(f"Server applied {response.headers['Content-Encoding']} encoding to {self.url}, cannot track download offsets")
+        if self.position and response.status_code != 206:
+            response.close()
+            raise RuntimeError(f"Server does not support resuming downloads from {self.url}")
+        if not self.position:
+            self.total = int(response.headers.get("Content-Length", 0))
+        self._response = response
+
+    def read(self, size: int = -1) -> bytes:
+        while True:
+            try:
+                if self._response is None:
+                    self._open()
+                data = self._response.raw.read(size)
+                if not data and self.position < self.total:
+                    raise IOError(f"Connection closed after {self.position} of {self.total} bytes")
+                break
+            except (requests.RequestException, urllib3.exceptions.HTTPError, IOError) as e:
+                # The budget covers the whole download, not a single chunk
+                self._retries += 1
+                if self._retries > self.max_retries:
+                    raise
+                delay = 2 ** self._retries
+                print(f"Download of {self.name} interrupted ({e}), resuming from byte {self.position} in {delay}s...")
+                if self._response is not None:
+                    self._response.close()
+                    self._response = None
+                time.sleep(delay)
+
+        self.position += len(data)
+        self._report_progress()
+        return data
+
+    def _report_progress(self) -> None:
+        # Print roughly every 10% so large archives show signs of life
+        if self.total and self.position * 10 // self.total > self._last_reported * 10 // self.total:
+            mb = 1024 * 1024
+            print(f"  {self.name}: {self.position * 100 // self.total}% ({self.position // mb}MB / {self.total // mb}MB)")
+        self._last_reported = self.position
+
+    def close(self) -> None:
+        if self._response is not None:
+            self._response.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def _stream_download(url: str, dest: Path, chunk_size: int = 1024 * 1024) -> None:
+    """Stream a URL to disk chunk by chunk instead of buffering the whole response."""
+    with _ResumableDownload(url) as src, open(dest, "wb") as f:
+        shutil.copyfileobj(src, f, length=chunk_size)
+        # Make sure the bytes are on disk before callers record the download as complete
+        f.flush()
+        os.fsync(f.fileno())
+
+
+# tarfile extraction filters only exist from Python 3.11.4 onwards
+_HAS_TAR_FILTERS = hasattr(tarfile, "data_filter")
+
+
+def _check_tar_member(member: tarfile.TarInfo, dest: Path) -> tarfile.TarInfo:
+    """Reject members that would be written, or would link, outside of dest."""
+    if _HAS_TAR_FILTERS:
+        # The "data" filter rejects absolute paths, ".." and anything that would
+        # land outside dest through an already extracted symlink
+        return tarfile.data_filter(member, str(dest))
+
+    dest_real = os.path.realpath(dest)
+    target_real = os.path.realpath(os.path.join(dest_real, member.name))
+    if os.path.commonpath([dest_real, target_real]) != dest_real:
+        raise ValueError(f"Refusing to extract {member.name} outside of {dest}")
+    if member.issym() or member.islnk():
+        link_base = os.path.dirname(target_real) if member.issym() else dest_real
+        link_real = os.path.realpath(os.path.join(link_base, member.linkname))
+        if os.path.isabs(member.linkname) or os.path.commonpath([dest_real, link_real]) != dest_real:
+            raise ValueError(f"Refusing to extract {member.name} linking outside of {dest}")
+    return member
+
+
+def _extract_tar(tar: tarfile.TarFile, dest: Path) -> None:
+    """Extract a tar archive member by member, copying file data in bounded chunks."""
+    extract_kwargs = {"filter": "data"} if _HAS_TAR_FILTERS else {}
+    directories = []
+    for member in tar:
+        member = _check_tar_member(member, dest)
+        target = dest / member.name
+
+        if member.isdir():
+            target.mkdir(parents=True, exist_ok=True)
+            directories.append((target, member))
+        elif member.isfile():
+            target.parent.mkdir(parents=True, exist_ok=True)
+            with tar.extractfile(member) as src, open(target, "wb") as dst:
+                shutil.copyfileobj(src, dst, length=1024 * 1024)
+            target.chmod(member.mode & 0o777)
+            os.utime(target, (member.mtime, member.mtime))
+        else:
+            # Symlinks and other special members carry no data payload
+            tar.extract(member, dest, **extract_kwargs)
+
+    # Like extractall, set directory attributes last, deepest first, so that
+    # restrictive modes do not block writing their contents
+    for target, member in reversed(directories):
+        if member.mode is not None:
+            target.chmod(member.mode & 0o777)
+        os.utime(target, (member.mtime, member.mtime))
+
+
+def _stream_extract_tar(url: str, dest: Path) -> None:
+    """Download a .tar.gz and extract it on the fly without writing the archive to disk."""
+    with _ResumableDownload(url) as src, tarfile.open(fileobj=src, mode='r|gz') as tar:
+        _extract_tar(tar, dest)
+
+
+_EXEC_MODE = 0o755  # rwxr-xr-x
+
+
+@functools.lru_cache(maxsize=1)
+def _ensure_local_dirs() -> tuple[Path, Path]:
+    """Create ~/.local/lib and ~/.local/bin once per process and return them."""
+    home = Path.home()
+    local_lib = home / ".local" / "lib"
+    local_bin = home / ".local" / "bin"
+    local_lib.mkdir(parents=True, exist_ok=True)
+    local_bin.mkdir(parents=True, exist_ok=True)
+    return local_lib, local_bin
+
+
+# Installers run on worker threads and all update PATH
+_PATH_LOCK = threading.Lock()
+
+
+def _path_prepend(entry: str) -> None:
+    """Prepend entry to PATH unless it is already one of its components."""
+    with _PATH_LOCK:
+        current_path = os.environ.get('PATH', '')
+        if entry in current_path.split(os.pathsep):
+            return
+        os.environ['PATH'] = f"{entry}{os.pathsep}{current_path}" if current_path else entry
+
+
+@functools.lru_cache(maxsize=1)
+def _platform_info() -> tuple[str, str, bool]:
+    """Resolve the normalized (os, arch, known) triple once per process.
+
+    `known` is False when the host OS is not one we ship binaries for, in which
+    case os/arch fall back to linux/amd64.
+    """
     system = platform.system().lower()
     machine = platform.machine().lower()
 
     # Map Python's platform names to Go's GOOS/GOARCH
-    if system == "darwin":
-        goos = "darwin"
-        if machine in ["arm64", "aarch64"]:
-            goarch = "arm64"
-        else:
-            goarch = "amd64"  # Fallback for Intel Macs
-    elif system == "linux":
-        goos = "linux"
-        if machine in ["arm64", "aarch64"]:
-            goarch = "arm64"
-        else:
-            goarch = "amd64"
-    elif system == "windows":
-        goos = "windows"
-        goarch = "amd64"  # Most common on Windows
-        return f"databricks-devbox-{goos}-{goarch}.exe"
-    else:
+    if system == "windows":
+        return "windows", "amd64", True  # Most common on Windows
+    if system in ("darwin", "linux"):
+        arch = "arm64" if machine in ("arm64", "aarch64") else "amd64"
+        return system, arch, True
+    return "linux", "amd64", False
+
+
+def get_platform_binary_name() -> str:
+    """Get the platform-specific binary name."""
+    goos, goarch, known = _platform_info()
+    if not known:
         # Unknown platform, try generic binary
         return "databricks-devbox"
-
-    return f"databricks-devbox-{goos}-{goarch}"
+    suffix = ".exe" if goos == "windows" else ""
+    return f"databricks-devbox-{goos}-{goarch}{suffix}"
 
 
 def get_code_server_platform() -> tuple[str, str]:
     """Get the platform-specific info for code-server downloads."""
-    system = platform.system().lower()
-    machine = platform.machine().lower()
-
-    if system == "darwin":
-        os_name = "darwin"
-        if machine in ["arm64", "aarch64"]:
-            arch = "arm64"
-        else:
-            arch = "amd64"
-    elif system == "linux":
-        os_name = "linux"
-        if machine in ["arm64", "aarch64"]:
-            arch = "arm64"
-        else:
-            arch = "amd64"
-    else:
-        # Fallback to linux amd64 for unsupported platforms
-        os_name = "linux"
-        arch = "amd64"
-
+    os_name, arch, _ = _platform_info()
+    if os_name == "windows":
+        # code-server has no Windows release, fallback to linux amd64
+        return "linux", "amd64"
     return os_name, arch
 
 
+@functools.lru_cache(maxsize=1)
 def is_databricks_cli_installed() -> bool:
     """Check if databricks CLI is already installed and in PATH."""
     return shutil.which("databricks") is not None
@@ -79,29 +244,7 @@ def is_databricks_cli_installed() -> bool:
 
 def get_databricks_cli_platform() -> tuple[str, str]:
     """Get the platform-specific info for databricks CLI downloads."""
-    system = platform.system().lower()
-    machine = platform.machine().lower()
-
-    if system == "darwin":
-        os_name = "darwin"
-        if machine in ["arm64", "aarch64"]:
-            arch = "arm64"
-        else:
-            arch = "amd64"
-    elif system == "linux":
-        os_name = "linux"
-        if machine in ["arm64", "aarch64"]:
-            arch = "arm64"
-        else:
-            arch = "amd64"
-    elif system == "windows":
-        os_name = "windows"
-        arch = "amd64"  # Most common on Windows
-    else:
-        # Fallback to linux amd64 for unsupported platforms
-        os_name = "linux"
-        arch = "amd64"
-
+    os_name, arch, _ = _platform_info()
     return os_name, arch
 
 
@@ -111,17 +254,19 @@ def install_databricks_cli(version: str = "v0.270.0") -> bool:
         print("databricks CLI is already installed")
         return True
 
-    print(f"Installing Databricks CLI {version}...")
+    local_lib, local_bin = _ensure_local_dirs()
 
-    home = Path.home()
-    local_lib = home / ".local" / "lib"
-    local_bin = home / ".local" / "bin"
+    os_name, arch = get_databricks_cli_platform()
 
-    # Create directories
-    local_lib.mkdir(parents=True, exist_ok=True)
-    local_bin.mkdir(parents=True, exist_ok=True)
+    # A previous run may have installed the binary without its PATH entry surviving
+    target_binary = local_bin / ("databricks.exe" if os_name == "windows" else "databricks")
+    if target_binary.exists():
+        _path_prepend(str(local_bin))
+        _invalidate_which_cache()
+        print(f"databricks CLI found at {target_binary}")
+        return True
 
-    os_name, arch = get_databricks_cli_platform()
+    print(f"Installing Databricks CLI {version}...")
 
     # Handle different file extensions based on platform
     if os_name == "windows":
@@ -134,53 +279,44 @@ def install_databricks_cli(version: str = "v0.270.0") -> bool:
     url = f"https://github.com/databricks/cli/releases/download/{version}/{filename}"
 
     try:
-        # Download the archive
-        print(f"Downloading from {url}...")
-        archive_path = local_lib / filename
-        urllib.request.urlretrieve(url, archive_path)
-
-        # Extract the archive
-        print(f"Extracting {filename}...")
         target_dir = local_lib / f"databricks-cli-{version}"
 
         if os_name == "windows":
+            # Zip archives need a seekable file, so download to disk first
+            print(f"Downloading from {url}...")
+            archive_path = local_lib / filename
+            _stream_download(url, archive_path)
+
+            print(f"Extracting {filename}...")
             with zipfile.ZipFile(archive_path, 'r') as zip_ref:
                 zip_ref.extractall(target_dir)
+            archive_path.unlink()
         else:
-            with tarfile.open(archive_path, 'r:gz') as tar:
-                tar.extractall(target_dir)
+            # Extract while downloading, the tarball never touches disk
+            print(f"Downloading and extracting {url}...")
+            _stream_extract_tar(url, target_dir)
 
         # Find the databricks binary in extracted files
-        databricks_binary = None
-        for root, _, files in os.walk(target_dir):
-            if binary_name in files:
-                databricks_binary = Path(root) / binary_name
-                break
+        databricks_binary = next((p for p in target_dir.rglob(binary_name) if p.is_file()), None)
 
         if not databricks_binary:
             print(f"Could not find {binary_name} in extracted files")
             return False
 
-        # Copy binary to local bin
-        target_binary = local_bin / "databricks"
-        if os_name == "windows":
-            target_binary = local_bin / "databricks.exe"
-
-        shutil.copy2(databricks_binary, target_binary)
+        # Move binary to local bin, the extracted tree is deleted right after so a rename avoids copying it
+        os.replace(databricks_binary, target_binary)
 
         # Make binary executable (Unix-like systems)
         if os_name != "windows":
-            target_binary.chmod(stat.S_IRWXU | stat.S_IRGRP | stat.S_IXGRP | stat.S_IROTH | stat.S_IXOTH)
+            target_binary.chmod(_EXEC_MODE)
 
         # Clean up
-        archive_path.unlink()
         shutil.rmtree(target_dir)
 
         # Add local bin to PATH
-        current_path = os.environ.get('PATH', '')
         local_bin_str = str(local_bin)
-        if local_bin_str not in current_path:
-            os.environ['PATH'] = f"{local_bin_str}:{current_path}"
+        _path_prepend(local_bin_str)
+        _invalidate_which_cache()
 
         print(f"Databricks CLI {version} installed successfully")
         print(f"Binary location: {target_binary}")
@@ -193,45 +329,47 @@ def install_databricks_cli(version: str = "v0.270.0") -> bool:
         return False
 
 
+@functools.lru_cache(maxsize=1)
 def is_code_server_installed() -> bool:
     """Check if code-server is already installed and in PATH."""
     return shutil.which("code-server") is not None
 
 
+def _invalidate_which_cache() -> None:
+    """Forget memoized PATH lookups, call after modifying PATH."""
+    is_databricks_cli_installed.cache_clear()
+    is_code_server_installed.cache_clear()
+
+
 def install_code_server(version: str = "v4.104.1") -> bool:
     """Install code-server using pure Python if not already installed."""
     if is_code_server_installed():
         print("code-server is already installed")
         return True
 
-    print(f"Installing code-server {version}...")
+    local_lib, _ = _ensure_local_dirs()
+    target_dir = local_lib / f"code-server-{version}"
 
-    home = Path.home()
-    local_lib = home / ".local" / "lib"
-    local_bin = home / ".local" / "bin"
+    # A previous run may have installed code-server without its PATH entry surviving
+    if (target_dir / "bin" / "code-server").exists():
+        _path_prepend(str(target_dir / "bin"))
+        _invalidate_which_cache()
+        print(f"code-server {version} found at {target_dir}")
+        return True
 
-    # Create directories
-    local_lib.mkdir(parents=True, exist_ok=True)
-    local_bin.mkdir(parents=True, exist_ok=True)
+    print(f"Installing code-server {version}...")
 
     os_name, arch = get_code_server_platform()
     filename = f"code-server-{version}-{os_name}-{arch}.tar.gz"
     url = f"https://github.com/coder/code-server/releases/download/v{version}/{filename}"
 
     try:
-        # Download the tarball
-        print(f"Downloading from {url}...")
-        tarball_path = local_lib / filename
-        urllib.request.urlretrieve(url, tarball_path)
-
-        # Extract the tarball
-        print(f"Extracting {filename}...")
-        with tarfile.open(tarball_path, 'r:gz') as tar:
-            tar.extractall(local_lib)
+        # Extract while downloading, the tarball never touches disk
+        print(f"Downloading and extracting {url}...")
+        _stream_extract_tar(url, local_lib)
 
         # Move extracted directory to standard name
         extracted_dir = local_lib / f"code-server-{version}-{os_name}-{arch}"
-        target_dir = local_lib / f"code-server-{version}"
 
         if extracted_dir.exists():
             if target_dir.exists():
@@ -240,16 +378,12 @@ def install_code_server(version: str = "v4.104.1") -> bool:
 
         # Make binary executable
         code_server_binary = target_dir / "bin" / "code-server"
-        code_server_binary.chmod(stat.S_IRWXU | stat.S_IRGRP | stat.S_IXGRP | stat.S_IROTH | stat.S_IXOTH)
-
-        # Clean up tarball
-        tarball_path.unlink()
+        code_server_binary.chmod(_EXEC_MODE)
 
         # Add code-server bin directory to PATH
-        current_path = os.environ.get('PATH', '')
         code_server_bin_str = str(target_dir / "bin")
-        if code_server_bin_str not in current_path:
-            os.environ['PATH'] = f"{code_server_bin_str}:{current_path}"
+        _path_prepend(code_server_bin_str)
+        _invalidate_which_cache()
 
         print(f"code-server {version} installed successfully")
         print(f"Binary location: {code_server_binary}")
@@ -269,16 +403,26 @@ def download_binary_from_github(version: str, binary_name: str, target_path: Pat
     try:
         print(f"Downloading binary from {url}...")
         target_path.parent.mkdir(parents=True, exist_ok=True)
-        urllib.request.urlretrieve(url, target_path)
+        _stream_download(url, target_path)
 
         # Make the binary executable
-        target_path.chmod(stat.S_IRWXU | stat.S_IRGRP | stat.S_IXGRP | stat.S_IROTH | stat.S_IXOTH)
+        target_path.chmod(_EXEC_MODE)
         print(f"Downloaded and made executable: {target_path}")
         return True
     except Exception as e:
         print(f"Failed to download binary: {e}")
         return False
 
+
+def _list_dir(path: Path) -> set[str]:
+    """Return the entry names in path, or an empty set if it cannot be listed."""
+    try:
+        with os.scandir(path) as entries:
+            return {entry.name for entry in entries}
+    except OSError:
+        return set()
+
+
 def find_binary(is_databricks_app_deployment: bool) -> str:
     """Find the Go binary, prioritizing GitHub releases if version is set."""
     current_dir = Path(__file__).parent.parent
@@ -311,8 +455,13 @@ def find_binary(is_databricks_app_deployment: bool) -> str:
             if download_binary_from_github(version, platform_binary_name, downloaded_binary):
                 # Save version info
                 try:
-                    with open(version_file, 'w') as f:
+                    # Swap the marker in atomically so a crash never leaves a torn .version behind
+                    tmp_version_file = version_file.with_name(".version.tmp")
+                    with open(tmp_version_file, 'w') as f:
                         f.write(version)
+                        f.flush()
+                        os.fsync(f.fileno())
+                    os.replace(tmp_version_file, version_file)
                 except:
                     pass
                 return str(downloaded_binary)
@@ -321,35 +470,28 @@ def find_binary(is_databricks_app_deployment: bool) -> str:
         else:
             return str(downloaded_binary)
 
-    # Fallback to local binaries (existing logic)
-
-    # Try platform-specific binary in build directory first
-    platform_binary = current_dir / "build" / platform_binary_name
-    if platform_binary.exists():
-        return str(platform_binary)
-
-    # Fallback: Look for generic binary in build directory
-    build_binary = current_dir / "build" / "databricks-devbox"
-    if build_binary.exists():
-        return str(build_binary)
-
-    # Fallback: Look for the binary in databricks_devbox_go directory
-    go_dir_binary = current_dir / "databricks_devbox_go" / "databricks-devbox"
-    if go_dir_binary.exists():
-        return str(go_dir_binary)
-
-    # Fallback: Look in current directory
-    current_binary = current_dir / "databricks-devbox"
-    if current_binary.exists():
-        return str(current_binary)
+    # Fallback to local binaries, in priority order: platform-specific build,
+    # generic build, databricks_devbox_go directory, then the project root
+    candidates = [
+        ("build", platform_binary_name),
+        ("build", "databricks-devbox"),
+        ("databricks_devbox_go", "databricks-devbox"),
+        (".", "databricks-devbox"),
+    ]
+    # Each parent directory is listed at most once, and only if an earlier candidate missed
+    listings: dict[str, set[str]] = {}
+    for parent, name in candidates:
+        if parent not in listings:
+            listings[parent] = _list_dir(current_dir / parent)
+        if name in listings[parent]:
+            return str(current_dir / parent / name)
 
     # Enhanced error message
     error_msg = f"Go binary not found. Tried:\n"
     if version is not None:
         error_msg += f"  - GitHub release {version}: {platform_binary_name}\n"
-    error_msg += f"  - build/{platform_binary_name}\n"
-    error_msg += f"  - build/databricks-devbox\n"
-    error_msg += f"  - databricks_devbox_go/databricks-devbox\n"
+    for parent, name in candidates:
+        error_msg += f"  - {os.path.normpath(os.path.join(parent, name))}\n"
     error_msg += f"\nOptions:\n"
     error_msg += f"  - Set LHA_SERVER_VERSION environment variable (e.g., '0.1.0')\n"
     error_msg += f"  - Or build locally: make build-go or make build-all"
@@ -370,12 +512,14 @@ def main():
         print("  CODE_SERVER_VERSION    - Version of code-server to install (default: v4.104.1)")
         return 0
 
-    # Install code-server if not already available
+    # Install code-server and databricks CLI if not already available,
+    # they are independent downloads so fetch them concurrently
     code_server_version = os.environ.get('CODE_SERVER_VERSION', '4.104.1')
-    install_code_server(code_server_version)
-
-    # Install databricks CLI if not already available
-    install_databricks_cli()
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        code_server_future = executor.submit(install_code_server, code_server_version)
+        databricks_cli_future = executor.submit(install_databricks_cli)
+        code_server_future.result()
+        databricks_cli_future.result()
 
     is_databricks_app_deployment = os.environ.get("DATABRICKS_APP_DEPLOYMENT", "false") == "true"
     # Set config file path for the Go binary
@@ -393,9 +537,12 @@ def main():
         setup_node_and_vibe_coding_tools()
         setup_databricks_cfg()
 
-    env = os.environ.copy()
+    # Build the child environment in one pass, PORT belongs to the Databricks App and is not passed on
+    env = {key: value for key, value in os.environ.items() if key != "PORT"}
     env['DEVBOX_SERVER_PORT'] = port
-    env['PATH'] = f"{env['PATH']}:/app/python/source_code/.venv/bin/"
+    venv_bin = "/app/python/source_code/.venv/bin/"
+    if venv_bin not in env['PATH'].split(os.pathsep):
+        env['PATH'] = f"{env['PATH']}{os.pathsep}{venv_bin}"
 
     # Set config file path for the Go binary
     config_path = os.path.join(os.path.dirname(__file__), "devbox.yaml")
@@ -405,7 +552,6 @@ def main():
     else:
         print(f"Warning: Config file not found at {config_path}, Go binary will use defaults")
 
-    env.pop("PORT", None)
     try:
         print("\nNow starting the actual Go server...")
 
@@ -1,25 +1,87 @@
+import functools
+import json
+import os
+import time
+from pathlib import Path
+
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
-def get_latest_tag(repo_url: str = "https://github.com/stikkireddy/databricks-devbox", release: bool = True) -> str | None:
-    """
-    Get the latest tag from a GitHub repository.
+CACHE_FILE = Path.home() / ".cache" / "databricks-devbox" / "latest_tag.json"
+CACHE_TTL_SECONDS = 6 * 60 * 60
+REQUEST_TIMEOUT = (3, 10)  # (connect, read) seconds
 
-    :param repo_url: Full GitHub repo URL (e.g., https://github.com/OWNER/REPO)
-    :param release: If True, fetch the latest *release* tag instead of just tags.
-    :return: Latest tag string or None if not found.
-    """
-    repo = "/".join(repo_url.rstrip("/").split("/")[-2:])
+_SESSION = requests.Session()
+_SESSION.mount("https://", HTTPAdapter(max_retries=Retry(total=3, backoff_factor=0.3)))
+
+
+def _read_cached_tag(repo: str, release: bool) -> tuple[str | None, float]:
+    """Return the cached tag for repo and its age in seconds, or (None, inf) if absent."""
+    try:
+        with open(CACHE_FILE, "r") as f:
+            cached = json.load(f)
+    except (OSError, ValueError):
+        return None, float("inf")
+
+    if cached.get("repo") != repo or cached.get("release") != release:
+        return None, float("inf")
+    return cached.get("tag"), time.time() - cached.get("fetched_at", 0)
+
+
+def _write_cached_tag(repo: str, release: bool, tag: str | None) -> None:
+    """Atomically persist the resolved tag so concurrent readers never see a torn file."""
+    try:
+        CACHE_FILE.parent.mkdir(parents=True, exist_ok=True)
+        tmp_file = CACHE_FILE.with_suffix(".json.tmp")
+        with open(tmp_file, "w") as f:
+            json.dump({"repo": repo, "release": release, "tag": tag, "fetched_at": time.time()}, f)
+        os.replace(tmp_file, CACHE_FILE)
+    except OSError:
+        pass
+
+
+def _fetch_latest_tag(repo: str, release: bool) -> str | None:
     if release:
         url = f"https://api.github.com/repos/{repo}/releases/latest"
-        resp = requests.get(url)
+        resp = _SESSION.get(url, timeout=REQUEST_TIMEOUT)
         resp.raise_for_status()
         return resp.json().get("tag_name")
     else:
         url = f"https://api.github.com/repos/{repo}/tags"
-        resp = requests.get(url)
+        resp = _SESSION.get(url, timeout=REQUEST_TIMEOUT)
         resp.raise_for_status()
         tags = resp.json()
         return tags[0]["name"] if tags else None
 
+
+@functools.lru_cache(maxsize=8)
+def get_latest_tag(repo_url: str = "https://github.com/stikkireddy/databricks-devbox", release: bool = True) -> str | None:
+    """
+    Get the latest tag from a GitHub repository.
+
+    The result is cached on disk for CACHE_TTL_SECONDS; a stale cached tag is
+    returned if the GitHub API cannot be reached.
+
+    :param repo_url: Full GitHub repo URL (e.g., https://github.com/OWNER/REPO)
+    :param release: If True, fetch the latest *release* tag instead of just tags.
+    :return: Latest tag string or None if not found.
+    """
+    repo = "/".join(repo_url.rstrip("/").split("/")[-2:])
+    cached_tag, age = _read_cached_tag(repo, release)
+    if cached_tag is not None and age < CACHE_TTL_SECONDS:
+        return cached_tag
+
+    try:
+        tag = _fetch_latest_tag(repo, release)
+    except requests.RequestException:
+        if cached_tag is not None:
+            print(f"Could not reach GitHub, using cached tag {cached_tag}")
+            return cached_tag
+        raise
+
+    _write_cached_tag(repo, release, tag)
+    return tag
+
 if __name__ == "__main__":
-    print(get_latest_tag())
\ No newline at end of file
+    print(get_latest_tag())
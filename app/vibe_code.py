@@ -7,6 +7,12 @@ from databricks.sdk import WorkspaceClient
 
 DEFAULT_ROOT_DIR = "/app/python/source_code"
 DEFAULT_ROOT_DIR_PATH = Path(DEFAULT_ROOT_DIR)
+VIBE_CODING_NPM_PACKAGES = [
+    "@anthropic-ai/claude-code",
+    "@musistudio/claude-code-router",
+    "@openai/codex",
+    "@google/gemini-cli",
+]
 
 def generate_spn_token(duration_seconds = 3600):
     w = WorkspaceClient()
@@ -88,8 +94,7 @@ def make_config(databricks_token: str, root_dir: Path = DEFAULT_ROOT_DIR_PATH):
       }
     }
 
-def get_databricks_transformers_js():
-    return """const fs = require('fs');
+_DATABRICKS_TRANSFORMERS_JS = """const fs = require('fs');
 const path = require('path');
 const os = require('os');
 
@@ -184,6 +189,9 @@ class DatabricksTransformer {
 module.exports = DatabricksTransformer;
 """
 
+def get_databricks_transformers_js():
+    return _DATABRICKS_TRANSFORMERS_JS
+
 def materialize_configs(databricks_token: str):
     target_dir = DEFAULT_ROOT_DIR_PATH / ".claude-code-router"
     plugins_dir = target_dir / "plugins"
@@ -211,23 +219,16 @@ def setup_node_and_vibe_coding_tools():
     PATH = os.environ['PATH']
     Path(f"{HOME}/.npm-global/bin").mkdir(parents=True, exist_ok=True)
     os.environ["NPM_CONFIG_PREFIX"] = f"{HOME}/.npm-global"
-    os.environ["PATH"] = f"{HOME}/.npm-global/bin:{PATH}"
+    npm_global_bin = f"{HOME}/.npm-global/bin"
+    if npm_global_bin not in PATH.split(os.pathsep):
+        os.environ["PATH"] = f"{npm_global_bin}{os.pathsep}{PATH}"
     print("Finished setting up npm global user dir")
     databricks_token = generate_spn_token()
     materialize_configs(databricks_token)
 
-    # install 
-    # npm install -g @anthropic-ai/claude-code
-    _run(["npm", "install", "-g", "@anthropic-ai/claude-code"], env=os.environ)
-
-    # npm install -g @musistudio/claude-code-router
-    _run(["npm", "install", "-g", "@musistudio/claude-code-router"], env=os.environ)
-
-    # npm install -g @openai/codex
-    _run(["npm", "install", "-g", "@openai/codex"], env=os.environ)
-
-    # npm install -g @google/gemini-cli
-    _run(["npm", "install", "-g", "@google/gemini-cli"], env=os.environ)
+    # install all coding assistants with one npm invocation so the registry
+    # and global prefix are resolved once
+    _run(["npm", "install", "-g", *VIBE_CODING_NPM_PACKAGES], env=os.environ)
 
     # restart ccr proxy
     _run(["ccr", "restart"], env=os.environ)
@@ -238,17 +239,12 @@ def setup_node_and_vibe_coding_tools():
     ccr_code_alias = 'alias cc="ccr code"'
     codex_alias = "alias codex='mkdir -p $CODEX_HOME && \codex'"
 
-    if bashrc.exists():
-        with open(bashrc, "r") as f:
-            lines = f.read().splitlines()
-    else:
-        lines = []
+    existing = {line.strip() for line in bashrc.read_text().splitlines()} if bashrc.exists() else set()
+    missing = [alias for alias in (ccr_code_alias, codex_alias) if alias not in existing]
 
-    if not any(l.strip() == ccr_code_alias for l in lines):
+    if missing:
         with open(bashrc, "a") as f:
-            f.write("\n")
-            f.write(f"{ccr_code_alias}\n")
-            f.write(f"{codex_alias}\n")
+            f.write("\n" + "\n".join(missing) + "\n")
         print(f"Added alias to {bashrc}")
     else:
         print("Alias already present in .bashrc")